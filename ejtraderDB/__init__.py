@@ -4,7 +4,6 @@ from .exceptions import Empty, Full
 try:
     from .dict import DictSQLite  #noqa
     from .sqlqueue import SQLiteQueue, FIFOSQLiteQueue, FILOSQLiteQueue, UniqueQ  # noqa
-    from .questdb import QuestDB # noqa
     from .sqlackqueue import SQLiteAckQueue, UniqueAckQ
     
 except ImportError:
@@ -13,4 +12,13 @@ except ImportError:
     log = logging.getLogger(__name__)
     log.info("No sqlite3 module found, sqlite3 based queues are not available")
 
+try:
+    from .questdb import QuestDB # noqa
+
+except ImportError as e:
+    import logging
+
+    log = logging.getLogger(__name__)
+    log.info("QuestDB is not available, missing dependency: {}".format(e))
+
 __all__ = ["DictSQLite", "SQLiteQueue", "FIFOSQLiteQueue","FILOSQLiteQueue", "UniqueQ", "Empty", "Full","QuestDB"]
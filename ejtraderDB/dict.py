@@ -1,27 +1,234 @@
 #! coding = utf-8
+import contextlib
+import itertools
 import logging
-import sqlite3
+import threading
+import time as _time
+from collections import OrderedDict
+from collections.abc import MutableMapping
 
 from ejtraderDB import sqlbase
+import ejtraderDB.serializers.msgspec
 
 log = logging.getLogger(__name__)
 
 
-class DictSQLite(sqlbase.SQLiteBase, dict):
+class DictSQLite(sqlbase.SQLiteBase, MutableMapping):
     _TABLE_NAME = 'dict'
     _KEY_COLUMN = 'key'
     _SQL_CREATE = ('CREATE TABLE IF NOT EXISTS {table_name} ('
-                   '{key_column} TEXT PRIMARY KEY, data BLOB)')
+                   '{key_column} TEXT PRIMARY KEY, data BLOB) WITHOUT ROWID')
     _SQL_INSERT = 'INSERT INTO {table_name} (key, data) VALUES (?, ?)'
     _SQL_SELECT = ('SELECT {key_column}, data FROM {table_name} '
                    'WHERE {key_column} = ?')
     _SQL_UPDATE = 'UPDATE {table_name} SET data = ? WHERE {key_column} = ?'
+    _SQL_UPSERT = ('INSERT INTO {table_name} (key, data) VALUES (?, ?) '
+                   'ON CONFLICT({key_column}) DO UPDATE SET data=excluded.data')
+    _SQL_DELETE = 'DELETE FROM {table_name} WHERE {key_column} = ?'
+    _SQL_COUNT = 'SELECT COUNT({key_column}) FROM {table_name}'
+    _SQL_CLEAR = 'DELETE FROM {table_name}'
 
-    def __init__(self, path, name=None, multithreading=False):
+    def __init__(self, path, name=None, multithreading=False,
+                 serializer=ejtraderDB.serializers.msgspec,
+                 synchronous='NORMAL', temp_store='MEMORY',
+                 mmap_size=268435456, cache_size=-65536,
+                 optimize_interval=None, read_cache_size=0):
+        """Initiate a persistent dict in sqlite3.
+        :param serializer: defaults to msgpack via msgspec, which loads
+                           tuples as lists and naive datetimes as strings,
+                           pass `ejtraderDB.serializers.pickle` to keep those
+                           types or to store objects msgpack can't
+                           represent, e.g. DataFrames.
+        :param synchronous: PRAGMA synchronous level, use `FULL` for
+                            durability-critical workloads.
+        :param temp_store: PRAGMA temp_store, where temporary tables and
+                           indices are kept.
+        :param mmap_size: PRAGMA mmap_size in bytes, 0 disables memory-mapped
+                          I/O.
+        :param cache_size: PRAGMA cache_size, negative values are KiB,
+                           positive values are pages.
+        :param optimize_interval: seconds between `PRAGMA optimize` runs for
+                                  long-lived dicts, checked on write. It
+                                  always runs on `close`.
+        :param read_cache_size: number of deserialized values kept in an LRU
+                                cache in front of reads, 0 disables it. Only
+                                safe while this instance is the sole writer,
+                                and cached values are shared between reads.
+        """
+        self._pragmas = (
+            ('synchronous', synchronous),
+            ('temp_store', temp_store),
+            ('mmap_size', mmap_size),
+            ('cache_size', cache_size),
+        )
+        self.optimize_interval = optimize_interval
+        self.read_cache_size = read_cache_size
         # PDict is always auto_commit=True
         super(DictSQLite, self).__init__(path, name=name,
                                     multithreading=multithreading,
-                                    auto_commit=True)
+                                    auto_commit=True,
+                                    serializer=serializer)
+
+    def _new_db_connection(self, path, multithreading, timeout):
+        conn = super(DictSQLite, self)._new_db_connection(
+            path, multithreading, timeout)
+        for pragma, value in self._pragmas:
+            conn.execute('PRAGMA {}={};'.format(pragma, value))
+        return conn
+
+    def _init(self):
+        self._sql_upsert = self._format_sql(self._SQL_UPSERT)
+        self._sql_delete = self._format_sql(self._SQL_DELETE)
+        self._sql_count = self._format_sql(self._SQL_COUNT)
+        # thread currently inside a `transaction()` block, if any
+        self._tran_owner = None
+        self._read_cache = OrderedDict()
+        # bumped on every invalidation, so reads racing a write don't cache
+        # the value they loaded before it
+        self._read_cache_generation = 0
+        self._read_cache_lock = threading.Lock()
+        self._closed = False
+        self._next_optimize = None
+        if self.optimize_interval:
+            self._next_optimize = _time.monotonic() + self.optimize_interval
+        super(DictSQLite, self)._init()
+        self._migrate_without_rowid()
+
+    def _migrate_without_rowid(self):
+        """Copy a table created by an earlier release, which kept a hidden
+        rowid next to the key index, into a WITHOUT ROWID table."""
+        row = self._putter.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (self._table_name.strip('`'),)).fetchone()
+        if row is None or 'WITHOUT ROWID' in row[0].upper():
+            return
+        log.info('Migrating table {} to WITHOUT ROWID'.format(
+            self._table_name))
+        tmp_table = '`{}_{}_migrate`'.format(self._TABLE_NAME, self.name)
+        with self.tran_lock:
+            with self._putter as tran:
+                tran.execute('BEGIN')
+                tran.execute(self._SQL_CREATE.format(
+                    table_name=tmp_table, key_column=self._key_column))
+                # NULL keys were accepted by the rowid table, but could never
+                # be read back, and the WITHOUT ROWID key is NOT NULL
+                dropped = tran.execute(
+                    'SELECT COUNT(*) FROM {} WHERE {} IS NULL'.format(
+                        self._table_name, self._key_column)).fetchone()[0]
+                if dropped:
+                    log.warning('Dropping {} unreadable NULL-key rows from '
+                                '{}'.format(dropped, self._table_name))
+                tran.execute('INSERT INTO {} ({}, data) SELECT {}, data '
+                             'FROM {} WHERE {} IS NOT NULL'.format(
+                                 tmp_table, self._key_column,
+                                 self._key_column, self._table_name,
+                                 self._key_column))
+                tran.execute('DROP TABLE {}'.format(self._table_name))
+                tran.execute('ALTER TABLE {} RENAME TO {}'.format(
+                    tmp_table, self._table_name))
+
+    @contextlib.contextmanager
+    def _writer(self):
+        """Yield the connection to write with, committing on exit unless
+        the calling thread is already inside a `transaction()` block."""
+        if self._tran_owner == threading.get_ident():
+            yield self._putter
+        else:
+            with self.tran_lock:
+                with self._putter as tran:
+                    yield tran
+                if (self._next_optimize is not None
+                        and _time.monotonic() >= self._next_optimize):
+                    self._optimize()
+                    self._next_optimize = (_time.monotonic()
+                                           + self.optimize_interval)
+
+    def _optimize(self):
+        """Let SQLite refresh its statistics, capping the work per table."""
+        for conn in {self._getter, self._putter}:
+            conn.execute('PRAGMA analysis_limit=1000;')
+            conn.execute('PRAGMA optimize;')
+
+    def close(self):
+        """Run `PRAGMA optimize` and close the DB connections, calling it
+        again is a no-op."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._optimize()
+        finally:
+            self._getter.close()
+            self._putter.close()
+
+    def __del__(self):
+        if not getattr(self, '_closed', True):
+            super(DictSQLite, self).__del__()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Group writes of the calling thread into one transaction, which is
+        committed on exit, or rolled back if the block raises. Reads of the
+        calling thread inside the block see its uncommitted writes."""
+        nested = self._tran_owner == threading.get_ident()
+        try:
+            with self._writer():
+                self._tran_owner = threading.get_ident()
+                try:
+                    yield self
+                finally:
+                    if not nested:
+                        self._tran_owner = None
+        finally:
+            if not nested:
+                self._invalidate()
+
+    @property
+    def _reader(self):
+        """Connection to read with, the writing one inside a `transaction()`
+        block of the calling thread, so it sees its uncommitted writes."""
+        if self._tran_owner == threading.get_ident():
+            return self._putter
+        return self._getter
+
+    def _select(self, *args):
+        return self._reader.execute(self._sql_select, args).fetchone()
+
+    def _count(self):
+        row = self._reader.execute(self._sql_count).fetchone()
+        return row[0] if row else 0
+
+    def _invalidate(self, keys=None):
+        """Drop `keys`, or everything, from the read cache."""
+        if not self.read_cache_size:
+            return
+        with self._read_cache_lock:
+            self._read_cache_generation += 1
+            if keys is None:
+                self._read_cache.clear()
+            else:
+                for key in keys:
+                    self._read_cache.pop(key, None)
+
+    def _upsert(self, key, obj):
+        with self._writer() as tran:
+            tran.execute(self._sql_upsert, (key, obj))
+        self._invalidate((key,))
+
+    def bulk_set(self, items):
+        """Write all (key, value) pairs of `items` in a single transaction."""
+        dumps = self._serializer.dumps
+        with self._writer() as tran:
+            tran.executemany(self._sql_upsert,
+                             ((key, dumps(value)) for key, value in items))
+        self._invalidate()
+
+    def update(self, other=(), **kwargs):
+        if hasattr(other, 'keys'):
+            items = ((key, other[key]) for key in other.keys())
+        else:
+            items = other
+        self.bulk_set(itertools.chain(items, kwargs.items()))
 
     def __iter__(self):
         raise NotImplementedError('Not supported.')
@@ -44,26 +251,58 @@ class DictSQLite(sqlbase.SQLiteBase, dict):
     def items(self):
         raise NotImplementedError('Not supported.')
 
+    def popitem(self):
+        raise NotImplementedError('Not supported.')
+
+    def clear(self):
+        with self._writer() as tran:
+            tran.execute(self._format_sql(self._SQL_CLEAR))
+        self._invalidate()
+
+    def __eq__(self, other):
+        # comparing contents would need iteration, which is not supported
+        return self is other
+
     def __contains__(self, item):
+        if (self.read_cache_size and item in self._read_cache
+                and self._tran_owner != threading.get_ident()):
+            return True
         row = self._select(item)
         return row is not None
 
     def __setitem__(self, key, value):
         obj = self._serializer.dumps(value)
-        try:
-            self._insert_into(key, obj)
-        except sqlite3.IntegrityError:
-            self._update(key, obj)
+        self._upsert(key, obj)
 
-    def __getitem__(self, item):
+    def _load(self, item):
         row = self._select(item)
         if row:
             return self._serializer.loads(row[1])
         else:
             raise KeyError('Key: {} not exists.'.format(item))
 
+    def __getitem__(self, item):
+        # uncommitted values must not reach other threads through the cache
+        if (not self.read_cache_size
+                or self._tran_owner == threading.get_ident()):
+            return self._load(item)
+        with self._read_cache_lock:
+            if item in self._read_cache:
+                self._read_cache.move_to_end(item)
+                return self._read_cache[item]
+            generation = self._read_cache_generation
+        value = self._load(item)
+        with self._read_cache_lock:
+            if generation == self._read_cache_generation:
+                self._read_cache[item] = value
+                if len(self._read_cache) > self.read_cache_size:
+                    self._read_cache.popitem(last=False)
+        return value
+
     def __delitem__(self, key):
-        self._delete(key)
+        with self._writer() as tran:
+            tran.execute(self._sql_delete, (key,))
+        self._invalidate((key,))
 
     def __len__(self):
         return self._count()
\ No newline at end of file
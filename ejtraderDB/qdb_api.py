@@ -5,11 +5,22 @@
 # Date:         08.12.2021
 # Version:      0.0.1
 
+from collections import namedtuple
+from functools import lru_cache
 from re import match
 from sqlvalidator import sql_validator
 
 restricted_chars = [" ", ".", "?", ",", ":", "\\", "/",
                     "\\\\", "\0", ")", "(", "_", "+", "-", "*", "~", "%"]
+# single characters of `restricted_chars`, for C-level membership tests
+RESTRICTED_CHARSET = frozenset("".join(restricted_chars))
+
+
+@lru_cache(maxsize=1024)
+def _validate_sql(query: str) -> bool:
+    """Validate a query once, repeated queries are answered from the cache"""
+    return sql_validator.parse(query).is_valid()
+
 
 API = {
     "imp": {
@@ -31,7 +42,7 @@ API = {
         "durable": {
             "required": False,
             "default": False,
-            "check": lambda x: type(x) == bool,
+            "check": lambda x: isinstance(x, bool),
             "type": bool,
             "description": "true or false. When set to true, import will be resilient against OS errors or power losses by forcing the data to be fully persisted before sending a response back to the user."
         },
@@ -45,7 +56,7 @@ API = {
         "forceHeader": {
             "required": False,
             "default": False,
-            "check": lambda x: type(x) == bool,
+            "check": lambda x: isinstance(x, bool),
             "type": bool,
             "description": "true or false. When false, QuestDB will try to infer if the first line of the file is the header line. When set to true, QuestDB will expect that line to be the header file."
         },
@@ -66,7 +77,7 @@ API = {
         "overwrite": {
             "required": False,
             "default": False,
-            "check": lambda x: type(x) == bool,
+            "check": lambda x: isinstance(x, bool),
             "type": bool,
             "description": "true or false. When set to true, any existing data or structure will be overwritten."
         },
@@ -80,7 +91,7 @@ API = {
         "skipLev": {
             "required": False,
             "default": False,
-            "check": lambda x: type(x) == bool,
+            "check": lambda x: isinstance(x, bool),
             "type": bool,
             "description": "true or false. Skip \"Line Extra Values\", when set to true, the parser will ignore those extra values rather than ignoring entire line. An extra value is something in addition to what is defined by the header."
         },
@@ -97,7 +108,7 @@ API = {
         "count": {
             "required": False,
             "default": False,
-            "check": lambda x: type(x) == bool,
+            "check": lambda x: isinstance(x, bool),
             "type": bool,
             "description": "True or false. Counts the number of rows and returns this value."
         },
@@ -111,21 +122,21 @@ API = {
         "nm": {
             "required": False,
             "default": False,
-            "check": lambda x: type(x) == bool,
+            "check": lambda x: isinstance(x, bool),
             "type": bool,
             "description": "true or false. Skips the metadata section of the response when set to true."
         },
         "query": {
             "required": True,
             "default": "",
-            "check": lambda x: sql_validator.parse(x).is_valid(),
+            "check": _validate_sql,
             "type": str,
             "description": "URL encoded query text. It can be multiline."
         },
         "timings": {
             "required": False,
             "default": False,
-            "check": lambda x: type(x) == bool,
+            "check": lambda x: isinstance(x, bool),
             "type": bool,
             "description": "true or false. When set to true, QuestDB will also include a timings property in the response which gives details about the execution."
         }
@@ -142,7 +153,7 @@ API = {
         "query": {
             "required": True,
             "default": "",
-            "check": lambda x: sql_validator.parse(x).is_valid(),
+            "check": _validate_sql,
             "type": str,
             "description": "URL encoded query text. It can be multi-line."
         },
@@ -155,3 +166,14 @@ API = {
         }
     }
 }
+
+# Parameter descriptors of a route, flattened for attribute access
+ParamSpec = namedtuple("ParamSpec", ["name", "required", "default", "check", "ptype"])
+
+API_FAST = {
+    route: {
+        name: ParamSpec(name, d["required"], d["default"], d["check"], d["type"])
+        for name, d in parameters.items() if isinstance(d, dict)
+    }
+    for route, parameters in API.items()
+}
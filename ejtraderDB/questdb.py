@@ -6,14 +6,20 @@
 # Version:      0.0.1
 
 from posixpath import sep
-from typing import Any, Union
+from typing import Union
 import requests
-from qdb_api import API, restricted_chars
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from .qdb_api import API, API_FAST, ParamSpec, RESTRICTED_CHARSET
 import sys
 import os
-from urllib.parse import quote_plus
 import pandas as pd
 
+try:
+    import pyarrow.csv as pv
+except ImportError:
+    pv = None
+
 
 class QuestDB:
     def __init__(self, base_url: str = "http://127.0.0.1:9000"):
@@ -23,6 +29,10 @@ class QuestDB:
             base_url (str, optional): API URL for QuestDB. Defaults to "http://127.0.0.1:9000".
         """
         self.session: requests.Session = requests.Session()
+        # keep connections alive across imp/exec/exp calls
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.url: str = base_url
 
     def imp(self,
@@ -68,7 +78,7 @@ class QuestDB:
             Union[str, dict]: Response in 'tabular' form or 'JSON', depending on 'fmt' parameter (defaults to 'tabular')
         """
         # API URL
-        url: str = f"{self.url}/imp?"
+        url: str = f"{self.url}/imp"
 
         # Structured input parameters/values
         parameters: dict = {
@@ -85,25 +95,23 @@ class QuestDB:
             "timestamp": timestamp
         }
 
-        # Check if CSV file exists
-        if not os.path.exists(filename):
-            print(f"File '{filename} does not exist on the system.")
-            sys.exit(1)
-
         # Iterative check of all parameters
-        for k, v in parameters.items():
-            if not self._check("imp", k, v):
-                self._not_compliant("imp", k)
-            else:
-                if v != API["imp"][k]["default"]:
-                    url += f"{k}={v}&"
-        if url.endswith("&"):
-            url = url[:-1]
+        params: dict = self._params("imp", parameters)
 
-        # send request
-        files: dict = {"data": open(filename, "rb")}
-        res: requests.Response = self.session.request(
-            API["imp"]["method"], url=url, files=files)
+        # Open the CSV file, which also checks that it exists
+        try:
+            f = open(filename, "rb")
+        except FileNotFoundError:
+            print(f"File '{filename}' does not exist on the system.")
+            sys.exit(1)
+
+        # send request, streaming the file instead of loading it into memory
+        with f:
+            data: MultipartEncoder = MultipartEncoder(
+                fields={"data": (os.path.basename(filename), f, "text/csv")})
+            res: requests.Response = self.session.request(
+                API["imp"]["method"], url=url, params=params, data=data,
+                headers={"Content-Type": data.content_type})
         if fmt == "tabular":
             return res.text
         elif fmt == "json":
@@ -133,37 +141,31 @@ class QuestDB:
             dict: JSON response
         """
         # API URL
-        url: str = f"{self.url}/exec?"
+        url: str = f"{self.url}/exec"
 
         # Structured input parameters/values
         parameters: dict = {
             "count": count,
             "limit": limit,
             "nm": nm,
-            "query": quote_plus(query),
+            "query": query,
             "timings": timings
         }
 
-        # Iterative check of all parameteres
-        for k, v in parameters.items():
-            if not self._check("exec", k, v):
-                self._not_compliant("exec", k)
-            else:
-                if v != API["exec"][k]["default"]:
-                    url += f"{k}={v}&"
-        if url.endswith("&"):
-            url = url[:-1]
+        # Iterative check of all parameters
+        params: dict = self._params("exec", parameters)
 
         # send request
         res: requests.Response = self.session.request(
-            API["exec"]["method"], url=url)
+            API["exec"]["method"], url=url, params=params)
         return res.json()
 
     def exp(self,
             limit: API["exp"]["limit"]["type"] = API["exp"]["limit"]["default"],
             query: API["exp"]["query"]["type"] = API["exp"]["query"]["default"],
             output: API["exp"]["format"]["type"] = API["exp"]["format"]["default"],
-            separator: str = ",") -> Union[pd.DataFrame, str]:
+            separator: str = ",",
+            engine: str = "pandas") -> Union[pd.DataFrame, str]:
         """This endpoint allows you to pass url-encoded queries but the request body is returned in a tabular form to be saved and reused as opposed to JSON.
 
         Args:
@@ -175,66 +177,62 @@ class QuestDB:
 
             `separator (str)`: CSV seperator (needed to properly format export data)
 
+            `engine (str, optional)`: CSV parser for `pandas` output, `pandas` or `pyarrow`. `pyarrow` parses multithreaded and must be installed, it also infers timestamp columns, which `pandas` leaves as strings, and does not support fields padded with blanks before their opening quote. Default is `pandas`.
+
         Returns:
             Union[pd.DataFrame, str]: Exported data in requested format.
         """
         # API URL
-        url: str = f"{self.url}/exp?"
+        url: str = f"{self.url}/exp"
 
         # Structured input parameters/values
         parameters: dict = {
             "limit": limit,
-            "query": quote_plus(query)
+            "query": query
         }
 
         # Iterative check of all parameters
-        for k, v in parameters.items():
-            if not self._check("exp", k, v):
-                self._not_compliant("exp", k)
-            else:
-                if v != API["exp"][k]["default"]:
-                    url += f"{k}={v}&"
-        if url.endswith("&"):
-            url = url[:-1]
+        params: dict = self._params("exp", parameters)
 
-        # send request
+        if output == "pandas":
+            if engine not in ("pandas", "pyarrow"):
+                print(f"[!] Engine '{engine}' is not supported, use 'pandas' or 'pyarrow'.")
+                sys.exit(1)
+            if engine == "pyarrow" and pv is None:
+                print("[!] Engine 'pyarrow' requires the pyarrow package.")
+                sys.exit(1)
+
+        # send request, DataFrames are parsed straight off the socket
         res: requests.Response = self.session.request(
-            API["exec"]["method"], url=url)
+            API["exp"]["method"], url=url, params=params,
+            stream=output == "pandas")
 
         # output as CSV
         if output == "csv":
             return res.text
         # output as Pandas DataFrame
         elif output == "pandas":
-            csv = res.text.split("\r\n")
-            data = []
-            columns = [i.strip('"').strip(" ")
-                       for i in csv[0].split(separator)]
-            for line in csv[1:]:
-                if line == '':
-                    continue
-                t = [self._assign_vartype(i.strip('"').strip(" "))
-                     for i in line.split(separator)]
-                data.append(t)
-
-            df = pd.DataFrame(data, columns=columns)
-            return df
-
-    def _assign_vartype(self, value: str) -> Any:
-        """Assign correct variable type to var
+            res.raw.decode_content = True
+            with res:
+                if engine == "pyarrow":
+                    table = pv.read_csv(
+                        res.raw, parse_options=pv.ParseOptions(delimiter=separator))
+                    return table.to_pandas(split_blocks=True, self_destruct=True)
+                return pd.read_csv(res.raw, sep=separator, engine="c",
+                                   quotechar='"', skipinitialspace=True)
+
+    def _to_api(self, value) -> str:
+        """Convert a parameter value to its query string form
 
         Args:
-            value (str): original value
+            value ([type]): Value of the parameter
 
         Returns:
-            Any: casted value
+            str: lower-cased `true`/`false` for booleans, else the value as string
         """
-        for t in [float, int, str]:
-            try:
-                casted = t(value)
-                return casted
-            except:
-                pass
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
 
     def _not_compliant(self, route: str, parameter: str):
         """Print error message if parameter is not compliant to API requirements
@@ -267,30 +265,48 @@ class QuestDB:
         Args:
             value ([type]): Value to check
         """
-        if type(value) != str:
+        if not isinstance(value, str):
             return
-        for c in str(value):
-            if c in restricted_chars:
-                print(
-                    f"[i] Restricted character '{c}' will be automatically removed!")
+        for c in sorted(RESTRICTED_CHARSET.intersection(value)):
+            print(
+                f"[i] Restricted character '{c}' will be automatically removed!")
 
-    def _check(self, route: str, parameter: str, value) -> bool:
-        """Check if parameter is mandatory and valid
+    def _params(self, route: str, parameters: dict) -> dict:
+        """Check all parameters of a request and collect the ones to send
 
         Args:
             route (str): API route
-            parameter (str): Name of the parameter
+            parameters (dict): Names and values of the parameters
+
+        Returns:
+            dict: Query parameters differing from their defaults, in API form
+        """
+        specs: dict = API_FAST[route]
+        params: dict = {}
+        for k, v in parameters.items():
+            spec: ParamSpec = specs[k]
+            if not self._check(spec, v):
+                self._not_compliant(route, k)
+            elif v != spec.default:
+                params[k] = self._to_api(v)
+        return params
+
+    def _check(self, spec: ParamSpec, value) -> bool:
+        """Check if parameter is mandatory and valid
+
+        Args:
+            spec (ParamSpec): Descriptor of the parameter
             value ([type]): Value of the parameter
 
         Returns:
             bool: if value is valid or not
         """
-        mandatory: bool = API[route][parameter]["required"]
-        fnct: function = API[route][parameter]["check"]
-        ptype: Any = API[route][parameter]["type"]
-        if mandatory and value == API[route][parameter]["default"]:
-            print(f"[!] Parameter '{parameter}' is mandatory!")
+        if spec.required and value == spec.default:
+            print(f"[!] Parameter '{spec.name}' is mandatory!")
             sys.exit(1)
-        if parameter != "query":
+        if spec.name != "query":
             self._contains_restricted_char(value)
-        return fnct(value) and type(value) == ptype
+        # bool is a subclass of int, but not a valid int parameter
+        if isinstance(value, bool) and spec.ptype is not bool:
+            return False
+        return isinstance(value, spec.ptype) and spec.check(value)
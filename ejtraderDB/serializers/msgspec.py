@@ -0,0 +1,52 @@
+#! coding = utf-8
+
+"""
+A serializer backed by msgspec's msgpack codec, reusing a single encoder and
+decoder, and adds a 4 byte length prefix to store multiple objects per file.
+
+msgpack has no tuple or naive datetime types: tuples are loaded as lists and
+naive datetimes as ISO 8601 strings, use timezone-aware datetimes or the
+pickle serializer to round-trip them. Values pickled by earlier releases are
+still loaded.
+"""
+
+from __future__ import absolute_import
+import msgspec
+import pickle
+import struct
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder()
+
+
+def dump(value, fp, sort_keys=False):
+    "Serialize value as msgpack to a byte-mode file object"
+    packed = dumps(value, sort_keys=sort_keys)
+    length = struct.pack("<L", len(packed))
+    fp.write(length)
+    fp.write(packed)
+
+
+def dumps(value, sort_keys=False):
+    "Serialize value as msgpack to bytes"
+    if sort_keys and isinstance(value, dict):
+        value = {key: value[key] for key in sorted(value)}
+    return _encoder.encode(value)
+
+
+def load(fp):
+    "Deserialize one msgpack value from a byte-mode file object"
+    length = struct.unpack("<L", fp.read(4))[0]
+    return _decoder.decode(fp.read(length))
+
+
+def loads(bytes_value):
+    "Deserialize one msgpack value from bytes, or a legacy pickled value"
+    try:
+        return _decoder.decode(bytes_value)
+    except msgspec.DecodeError:
+        # pickle protocol 2+ starts with the PROTO opcode b'\x80', which
+        # msgpack reads as an empty map followed by trailing bytes
+        if bytes_value[:1] == b"\x80" and len(bytes_value) > 1:
+            return pickle.loads(bytes_value)
+        raise
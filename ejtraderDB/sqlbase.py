@@ -84,6 +84,8 @@ class SQLiteBase(object):
         self.db_file_name = "data.db"
         if db_file_name:
             self.db_file_name = db_file_name
+        # formatted SQL statements, keyed by their template
+        self._sql_cache = {}
         self._init()
 
     def _init(self):
@@ -138,9 +140,8 @@ class SQLiteBase(object):
 
     @with_conditional_transaction
     def _delete(self, key, op='='):
-        sql = 'DELETE FROM {} WHERE {} {} ?'.format(self._table_name,
-                                                    self._key_column,
-                                                    op)
+        sql = self._format_sql(
+            'DELETE FROM {table_name} WHERE {key_column} ' + op + ' ?')
         return sql, (key,)
 
     def _select(self, *args, **kwargs):
@@ -152,8 +153,7 @@ class SQLiteBase(object):
         return self._getter.execute(self._sql_select, args).fetchone()
 
     def _count(self):
-        sql = 'SELECT COUNT({}) FROM {}'.format(self._key_column,
-                                                self._table_name)
+        sql = self._format_sql('SELECT COUNT({key_column}) FROM {table_name}')
         row = self._getter.execute(sql).fetchone()
         return row[0] if row else 0
 
@@ -169,25 +169,32 @@ class SQLiteBase(object):
     def _key_column(self):
         return self._KEY_COLUMN
 
+    def _format_sql(self, template):
+        """Format `template` with the table name and key column, caching
+        the result so repeated statements skip `str.format`."""
+        try:
+            return self._sql_cache[template]
+        except KeyError:
+            sql = template.format(table_name=self._table_name,
+                                  key_column=self._key_column)
+            self._sql_cache[template] = sql
+            return sql
+
     @property
     def _sql_create(self):
-        return self._SQL_CREATE.format(table_name=self._table_name,
-                                       key_column=self._key_column)
+        return self._format_sql(self._SQL_CREATE)
 
     @property
     def _sql_insert(self):
-        return self._SQL_INSERT.format(table_name=self._table_name,
-                                       key_column=self._key_column)
+        return self._format_sql(self._SQL_INSERT)
 
     @property
     def _sql_update(self):
-        return self._SQL_UPDATE.format(table_name=self._table_name,
-                                       key_column=self._key_column)
+        return self._format_sql(self._SQL_UPDATE)
 
     @property
     def _sql_select(self):
-        return self._SQL_SELECT.format(table_name=self._table_name,
-                                       key_column=self._key_column)
+        return self._format_sql(self._SQL_SELECT)
 
     def _sql_select_where(self, op, column):
         return self._SQL_SELECT_WHERE.format(table_name=self._table_name,